@@ -0,0 +1,108 @@
+from flask import Blueprint, jsonify, request, session
+
+from auth import login_required
+from extensions import db, get_ai_client
+from models import Chat, Message, PronunciationAttempt
+from prompts import system_prompt_for
+
+bp = Blueprint('ai', __name__)
+
+
+@bp.route("/api/chat", methods=["POST"])
+@login_required(role="student")
+def api_chat():
+    data = request.get_json()
+
+    user_message = data.get("message")
+    chat_id = data.get("chat_id")
+
+    if not user_message or not chat_id:
+        return jsonify({"error": "Missing message or chat_id"}), 400
+
+    chat = Chat.query.filter_by(
+        id=chat_id,
+        student_id=session["user_id"]
+    ).first_or_404()
+
+    # Save user message
+    user_msg = Message(
+        chat_id=chat.id,
+        sender="user",
+        content=user_message
+    )
+    db.session.add(user_msg)
+    db.session.commit()
+
+    try:
+        # Build conversation history
+        history = Message.query.filter_by(chat_id=chat.id).order_by(Message.created_on).all()
+
+        messages_for_ai = []
+        for m in history:
+            role = "assistant" if m.sender == "ai" else "user"
+            messages_for_ai.append({
+                "role": role,
+                "content": m.content
+            })
+
+        # Call OpenAI
+        response = get_ai_client().responses.create(
+            model="gpt-4.1-mini",
+            instructions=system_prompt_for(chat),
+            input=messages_for_ai
+        )
+
+        ai_reply = response.output_text
+
+        # Save AI reply
+        ai_msg = Message(
+            chat_id=chat.id,
+            sender="ai",
+            content=ai_reply
+        )
+        db.session.add(ai_msg)
+        db.session.commit()
+
+        return jsonify({"reply": ai_reply})
+
+    except Exception as e:
+        print("AI ERROR:", e)
+        return jsonify({"reply": "AI error occurred."}), 500
+
+
+@bp.route("/api/speech", methods=["POST"])
+@login_required(role="student")
+def speech_to_text():
+    audio = request.files["audio"]
+
+    with open("temp.webm", "wb") as f:
+        f.write(audio.read())
+
+    transcription = get_ai_client().audio.transcriptions.create(
+        model="gpt-4o-mini-transcribe",
+        file=open("temp.webm", "rb")
+    )
+
+    # Optional: score the recording against the phrase the student was asked to say
+    target = request.form.get("target")
+    if not target:
+        return jsonify({"text": transcription.text})
+
+    from pronunciation import score_pronunciation
+    result = score_pronunciation(target, transcription.text)
+
+    chat_id = request.form.get("chat_id", type=int)
+    if chat_id and not Chat.query.filter_by(id=chat_id, student_id=session["user_id"]).first():
+        chat_id = None
+
+    db.session.add(PronunciationAttempt(
+        student_id=session["user_id"],
+        chat_id=chat_id,
+        target=target,
+        transcript=transcription.text,
+        score=result["score"],
+        syllables=result["syllables"]
+    ))
+    db.session.commit()
+
+    return jsonify({"text": transcription.text, "pronunciation": result})
@@ -0,0 +1,124 @@
+from flask import Blueprint, current_app, abort, render_template, request, redirect, url_for, session, flash
+from functools import wraps
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from extensions import db
+from models import User
+
+bp = Blueprint('auth', __name__)
+
+
+def login_required(role=None):
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            if 'user_id' not in session:
+                # Workers without the auth blueprint (e.g. AI-only) have no login page to send to
+                if 'auth.login' not in current_app.view_functions:
+                    abort(401)
+                return redirect(url_for('auth.login'))
+
+            if role and session.get('role') != role:
+                if 'auth.index' not in current_app.view_functions:
+                    abort(403)
+                flash('Access denied', 'error')
+                return redirect(url_for('auth.index'))
+
+            return f(*args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def home_url(role):
+    # On a split deployment the home page may be served by another worker behind the
+    # same proxy, so fall back to its plain path when the blueprint is not registered here
+    endpoint = 'student.student_home' if role == 'student' else 'instructor.instructor_home'
+    if endpoint in current_app.view_functions:
+        return url_for(endpoint)
+    return '/student/home' if role == 'student' else '/instructor/home'
+
+
+@bp.route('/')
+def index():
+    return render_template('index.html')
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        password = request.form.get('password')
+
+        user = User.query.filter_by(email=email).first()
+        if user and check_password_hash(user.password, password):
+            session['user'] = user.name
+            session['email'] = user.email
+            session['user_id'] = user.id
+            session['role'] = user.role
+            return redirect(home_url(user.role))
+        else:
+            flash('Invalid email or password', 'error')
+
+    return render_template('auth/login.html')
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        name = request.form.get('fullname')
+        email = request.form.get('email')
+        password = request.form.get('password')
+        role = request.form.get('role') 
+
+        if User.query.filter_by(email=email).first():
+            flash('Email already exists', 'error')
+        else:
+            new_user = User(
+                name=name,
+                email=email,
+                password=generate_password_hash(password),
+                role = request.form.get('role').lower()
+            )
+            db.session.add(new_user)
+            db.session.commit()
+            flash('Account created successfully', 'success')
+            return redirect(url_for('auth.login'))
+        
+        if role not in ['student', 'instructor']:
+            flash('Invalid role selected', 'error')
+            return redirect(url_for('auth.register'))
+
+    return render_template('auth/register.html')
+
+
+@bp.route('/logout')
+def logout():
+    session.clear()  # removes all session data
+    flash("You have been logged out.", "success")
+    return redirect(url_for('auth.login'))  # redirect to login page
+
+# TEMP: test student page without logging in
+@bp.route('/test/student')
+def test_student():
+    student = User.query.filter_by(role='student').first()
+    if not student:
+        return "No student exists in DB", 500
+
+    session['user'] = student.name
+    session['email'] = student.email
+    session['role'] = 'student'
+    session['user_id'] = student.id
+
+    return redirect(home_url('student'))
+
+# TEMP: test instructor page without logging in
+@bp.route('/test/instructor')
+def test_instructor():
+    instructor = User.query.filter_by(role='instructor').first()
+    if not instructor:
+        return "No instructor exists in DB", 500
+
+    session['user'] = instructor.name
+    session['email'] = instructor.email
+    session['role'] = 'instructor'
+    session['user_id'] = instructor.id
+
+    return redirect(home_url('instructor'))
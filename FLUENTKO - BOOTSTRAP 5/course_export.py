@@ -0,0 +1,280 @@
+import gzip
+import io
+import json
+import uuid
+import zlib
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import User, Course, Lesson, Scenario, Chat, Message, StudentClass, ExerciseItem
+
+# Course export/import as newline-delimited JSON: one record per line, each with a
+# "type". Rows are read with yield_per so memory stays flat however many messages
+# a course has, and imports insert in batches while reading the file line by line.
+
+FORMAT = 'fluentko-course'
+FORMAT_VERSION = 1
+BATCH_SIZE = 1000
+
+# Everything a malformed or hostile file can raise while importing (BadGzipFile is an
+# OSError, a truncated gzip stream raises EOFError); the caller rolls back and reports it
+IMPORT_ERRORS = (ValueError, KeyError, TypeError, EOFError, OSError, IntegrityError)
+
+
+def _date(value):
+    return value.isoformat() if value else None
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def course_chats_query(course):
+    # Chats of enrolled students on this class's scenarios. Free practice belongs to the
+    # student, not to any class, so it is never part of a class export.
+    enrolled = db.select(StudentClass.student_id).where(StudentClass.course_id == course.id)
+    scenarios = db.select(Scenario.id).where(Scenario.course_id == course.id)
+    return (
+        Chat.query
+        .filter(Chat.student_id.in_(enrolled))
+        .filter(Chat.scenario_id.in_(scenarios))
+    )
+
+
+def export_course(course, include_passwords=False):
+    yield {"type": "header", "format": FORMAT, "version": FORMAT_VERSION, "exported_on": _date(datetime.now())}
+    yield {
+        "type": "course",
+        "code": course.code,
+        "name": course.name,
+        "subject": course.subject,
+        "section": course.section,
+        "room": course.room,
+        "is_archived": bool(course.is_archived),
+    }
+
+    students = (
+        User.query
+        .join(StudentClass, StudentClass.student_id == User.id)
+        .filter(StudentClass.course_id == course.id)
+        .order_by(User.id)
+        .yield_per(BATCH_SIZE)
+    )
+    for u in students:
+        record = {"type": "student", "id": u.id, "name": u.name, "email": u.email}
+        if include_passwords:
+            record["password"] = u.password
+        yield record
+
+    for l in Lesson.query.filter_by(course_id=course.id).order_by(Lesson.id).yield_per(BATCH_SIZE):
+        yield {"type": "lesson", "id": l.id, "title": l.title, "content": l.content, "posted_on": _date(l.posted_on)}
+
+    items = (
+        ExerciseItem.query
+        .join(Lesson)
+        .filter(Lesson.course_id == course.id)
+        .order_by(ExerciseItem.id)
+        .yield_per(BATCH_SIZE)
+    )
+    for i in items:
+        yield {
+            "type": "exercise_item", "lesson_id": i.lesson_id, "position": i.position,
+            "kind": i.kind, "prompt": i.prompt, "answer": i.answer, "choices": i.choices,
+        }
+
+    for s in Scenario.query.filter_by(course_id=course.id).order_by(Scenario.id).yield_per(BATCH_SIZE):
+        yield {
+            "type": "scenario", "id": s.id, "title": s.title, "description": s.description,
+            "status": s.status, "scenario_type": s.type, "version": s.version,
+        }
+
+    chats = course_chats_query(course)
+    for c in chats.order_by(Chat.id).yield_per(BATCH_SIZE):
+        yield {
+            "type": "chat", "id": c.id, "student_id": c.student_id, "scenario_id": c.scenario_id,
+            "title": c.title, "description": c.description, "difficulty": c.difficulty,
+            "character": c.character, "background": c.background, "created_on": _date(c.created_on),
+        }
+
+    # Plain column rows (no ORM objects) for the largest table
+    messages = (
+        db.session.query(Message.chat_id, Message.sender, Message.content, Message.created_on)
+        .filter(Message.chat_id.in_(chats.with_entities(Chat.id)))
+        .order_by(Message.chat_id, Message.id)
+        .execution_options(stream_results=True, yield_per=BATCH_SIZE)
+    )
+    for m in messages:
+        yield {"type": "message", "chat_id": m.chat_id, "sender": m.sender, "content": m.content, "created_on": _date(m.created_on)}
+
+
+def ndjson_gzip(records, flush_every=BATCH_SIZE):
+    # Compress as we go: yields gzip chunks, never the whole file
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if len(lines) >= flush_every:
+            chunk = compressor.compress(('\n'.join(lines) + '\n').encode('utf-8'))
+            lines = []
+            if chunk:
+                yield chunk
+    if lines:
+        yield compressor.compress(('\n'.join(lines) + '\n').encode('utf-8'))
+    yield compressor.flush()
+
+
+def open_export(fileobj):
+    # Line reader over an uploaded or local export, gzipped or plain
+    magic = fileobj.read(2)
+    fileobj.seek(0)
+    if magic == b'\x1f\x8b':
+        fileobj = gzip.GzipFile(fileobj=fileobj)
+    return io.TextIOWrapper(fileobj, encoding='utf-8')
+
+
+def import_course(lines, instructor, trusted=False):
+    # lines: NDJSON text lines, e.g. from open_export. Returns the new Course and a count per record type.
+    # Untrusted imports (uploads by an instructor) never touch existing accounts: a student whose
+    # email is already registered is skipped with their chats and rejoins with the class code.
+    # Only the admin CLI passes trusted=True, which matches existing students by email and keeps
+    # exported password hashes for the accounts it creates.
+    course = None
+    student_ids, lesson_ids, scenario_ids, chat_ids = {}, {}, {}, {}
+    enrolled = set()
+    pending = {ExerciseItem: [], Message: []}
+    counts = {}
+
+    def flush(model):
+        if pending[model]:
+            db.session.execute(insert(model), pending[model])
+            pending[model] = []
+
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number}: expected a JSON object")
+        kind = record.get("type")
+        counts[kind] = counts.get(kind, 0) + 1
+
+        if number == 1:
+            if kind != "header" or record.get("format") != FORMAT:
+                raise ValueError("Not a Fluentko course export")
+            version = record.get("version")
+            if not isinstance(version, int):
+                raise ValueError("Export has no format version")
+            if version > FORMAT_VERSION:
+                raise ValueError(f"Export format version {version} is newer than this server supports")
+            continue
+
+        if kind == "course":
+            code = record["code"]
+            if Course.query.filter_by(code=code).first():
+                code = f"{code}-{uuid.uuid4().hex[:6]}"
+            course = Course(
+                code=code,
+                name=record["name"],
+                subject=record["subject"],
+                section=record.get("section"),
+                room=record.get("room"),
+                is_archived=record.get("is_archived", False),
+                instructor_id=instructor.id
+            )
+            db.session.add(course)
+            db.session.flush()
+            continue
+
+        if course is None:
+            raise ValueError(f"Line {number}: course record must come before {kind} records")
+
+        if kind == "student":
+            if record["id"] in student_ids:
+                continue
+            user = User.query.filter_by(email=record["email"]).first()
+            if user and (not trusted or user.role != 'student'):
+                student_ids[record["id"]] = None
+                continue
+            if not user:
+                user = User(
+                    name=record["name"],
+                    email=record["email"],
+                    # Without an exported hash the student has to be given a new password
+                    password=(trusted and record.get("password")) or generate_password_hash(uuid.uuid4().hex),
+                    role='student'
+                )
+                db.session.add(user)
+                db.session.flush()
+            student_ids[record["id"]] = user.id
+            if user.id not in enrolled:
+                enrolled.add(user.id)
+                db.session.add(StudentClass(student_id=user.id, course_id=course.id))
+
+        elif kind == "lesson":
+            lesson = Lesson(course_id=course.id, title=record["title"], content=record.get("content"),
+                            posted_on=_parse_date(record.get("posted_on")))
+            db.session.add(lesson)
+            db.session.flush()
+            lesson_ids[record["id"]] = lesson.id
+
+        elif kind == "exercise_item":
+            pending[ExerciseItem].append({
+                "lesson_id": lesson_ids[record["lesson_id"]], "position": record["position"],
+                "kind": record["kind"], "prompt": record["prompt"], "answer": record["answer"],
+                "choices": record.get("choices"),
+            })
+            if len(pending[ExerciseItem]) >= BATCH_SIZE:
+                flush(ExerciseItem)
+
+        elif kind == "scenario":
+            scenario = Scenario(course_id=course.id, title=record["title"], description=record.get("description"),
+                                status=record.get("status"), type=record.get("scenario_type"),
+                                version=record.get("version", 1))
+            db.session.add(scenario)
+            db.session.flush()
+            scenario_ids[record["id"]] = scenario.id
+
+        elif kind == "chat":
+            student_id = student_ids[record["student_id"]]
+            # Only chats on this class's scenarios are restored (older exports also carried free practice)
+            scenario_id = scenario_ids.get(record.get("scenario_id"))
+            if student_id is None or scenario_id is None:
+                chat_ids[record["id"]] = None
+                continue
+            chat = Chat(
+                student_id=student_id,
+                scenario_id=scenario_id,
+                title=record["title"],
+                description=record["description"],
+                difficulty=record.get("difficulty"),
+                character=record.get("character"),
+                background=record.get("background"),
+                created_on=_parse_date(record.get("created_on"))
+            )
+            db.session.add(chat)
+            db.session.flush()
+            chat_ids[record["id"]] = chat.id
+
+        elif kind == "message":
+            chat_id = chat_ids[record["chat_id"]]
+            if chat_id is None:
+                continue
+            pending[Message].append({
+                "chat_id": chat_id, "sender": record["sender"],
+                "content": record["content"], "created_on": _parse_date(record.get("created_on")),
+            })
+            if len(pending[Message]) >= BATCH_SIZE:
+                flush(Message)
+
+    if course is None:
+        raise ValueError("Export contains no course")
+
+    flush(ExerciseItem)
+    flush(Message)
+    db.session.commit()
+    return course, counts
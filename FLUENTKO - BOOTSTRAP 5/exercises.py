@@ -0,0 +1,135 @@
+import json
+import random
+import re
+from datetime import datetime, timedelta, timezone
+
+from extensions import db, get_ai_client
+from models import ExerciseItem
+
+# Item banks are built once per lesson (by `flask instructor generate-exercises`),
+# so serving an exercise is only a database read.
+
+ITEMS_PER_LESSON = 20
+MIN_EASE = 1.3
+RETRY_AFTER = timedelta(minutes=10)
+
+SENTENCE_END = re.compile(r'(?<=[.!?。？！])\s+|\n+')
+
+
+def utcnow():
+    # Stored datetimes are naive UTC, like CURRENT_TIMESTAMP
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def normalize_answer(text):
+    return ''.join(ch for ch in (text or '') if ch.isalnum()).lower()
+
+
+def _words(sentence):
+    return [w.strip('.,!?;:"\'()[]') for w in sentence.split()]
+
+
+def build_items_from_text(content, limit=ITEMS_PER_LESSON, seed=0):
+    # Cloze items: one word of a lesson sentence is blanked out. When the lesson has
+    # enough other words they become the distractors of a multiple-choice item.
+    rng = random.Random(seed)
+    sentences = [s.strip() for s in SENTENCE_END.split(content or '') if s and len(_words(s)) >= 2]
+    vocabulary = sorted({w for s in sentences for w in _words(s) if len(w) >= 2})
+
+    items = []
+    for sentence in sentences[:limit]:
+        words = [w for w in _words(sentence) if len(w) >= 2]
+        if not words:
+            continue
+        answer = max(words, key=len)
+        prompt = sentence.replace(answer, '____', 1)
+        distractors = [w for w in vocabulary if w != answer]
+        if len(distractors) >= 3:
+            choices = rng.sample(distractors, 3) + [answer]
+            rng.shuffle(choices)
+            items.append({"kind": "choice", "prompt": prompt, "answer": answer, "choices": choices})
+        else:
+            items.append({"kind": "cloze", "prompt": prompt, "answer": answer, "choices": None})
+    return items
+
+
+AI_INSTRUCTIONS = (
+    "You write Korean practice exercises for a lesson. Reply with only a JSON array. "
+    "Each element is an object with: \"prompt\" (a Korean sentence from or based on the lesson "
+    "with exactly one word replaced by ____), \"answer\" (the missing word), and \"choices\" "
+    "(four options including the answer). Write at most {limit} exercises."
+)
+
+
+def build_items_with_ai(lesson, limit=ITEMS_PER_LESSON):
+    response = get_ai_client().responses.create(
+        model="gpt-4.1-mini",
+        instructions=AI_INSTRUCTIONS.format(limit=limit),
+        input=f"{lesson.title}\n\n{lesson.content or ''}"
+    )
+    text = response.output_text.strip()
+    # Tolerate the reply being wrapped in a ```json fence
+    text = text[text.find('['):text.rfind(']') + 1]
+
+    items = []
+    for raw in json.loads(text)[:limit]:
+        prompt, answer = raw.get("prompt"), raw.get("answer")
+        choices = raw.get("choices") or None
+        if not prompt or not answer:
+            continue
+        if choices and answer not in choices:
+            choices = None
+        items.append({"kind": "choice" if choices else "cloze", "prompt": prompt, "answer": answer, "choices": choices})
+    return items
+
+
+def generate_item_bank(lesson, use_ai=False, replace=False):
+    if not replace and ExerciseItem.query.filter_by(lesson_id=lesson.id).first():
+        return 0
+
+    items = []
+    if use_ai:
+        try:
+            items = build_items_with_ai(lesson)
+        except Exception as e:
+            print("AI ERROR:", e)
+    if not items:
+        items = build_items_from_text(lesson.content, seed=lesson.id)
+
+    # Rebuild in place by position so students' ExerciseReview rows (and their schedules)
+    # stay attached; only items past the end of the new bank are deleted
+    existing = {item.position: item for item in ExerciseItem.query.filter_by(lesson_id=lesson.id)}
+    for i, item in enumerate(items):
+        row = existing.pop(i, None)
+        if row is None:
+            db.session.add(ExerciseItem(lesson_id=lesson.id, position=i, **item))
+        else:
+            for field, value in item.items():
+                setattr(row, field, value)
+    for row in existing.values():
+        db.session.delete(row)
+    return len(items)
+
+
+def schedule_review(review, correct, now=None):
+    # SM-2 style: each correct answer stretches the interval by the item's ease,
+    # a wrong answer brings the item back shortly and makes it come back sooner later on
+    now = now or utcnow()
+    if correct:
+        review.repetitions += 1
+        if review.repetitions == 1:
+            review.interval_days = 1
+        elif review.repetitions == 2:
+            review.interval_days = 6
+        else:
+            review.interval_days = round(review.interval_days * review.ease, 2)
+        review.ease = round(review.ease + 0.1, 2)
+        review.due_on = now + timedelta(days=review.interval_days)
+    else:
+        review.repetitions = 0
+        review.lapses += 1
+        review.interval_days = 0
+        review.ease = max(MIN_EASE, round(review.ease - 0.2, 2))
+        review.due_on = now + RETRY_AFTER
+    review.last_reviewed = now
+    return review
@@ -0,0 +1,33 @@
+import sqlite3
+import threading
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bound to the app in create_app(); the engine only connects on first query
+db = SQLAlchemy()
+
+
+# SQLite foreign key enforcement
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON;")
+        cursor.close()
+
+
+_ai_client = None
+_ai_client_lock = threading.Lock()
+
+
+def get_ai_client():
+    # The OpenAI SDK is slow to import, so only pay for it on the first AI request
+    global _ai_client
+    if _ai_client is None:
+        with _ai_client_lock:
+            if _ai_client is None:
+                from openai import OpenAI
+                _ai_client = OpenAI()
+    return _ai_client
@@ -1,5 +1,96 @@
-from app import db, app
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from app import create_app
+from extensions import db
+from models import create_search_index
+
+app = create_app()
+
+
+def add_missing_columns():
+    # create_all() never alters existing tables, so bring an older users.db up to date
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+                    conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN {ddl}'))
+                    print(f"Added column {table.name}.{column.name}")
+
+
+def _foreign_keys(table):
+    return {
+        (tuple(fk.parent.name for fk in c.elements), c.referred_table.name, (c.ondelete or '').upper())
+        for c in table.foreign_key_constraints
+    }
+
+
+def _existing_foreign_keys(inspector, name):
+    return {
+        (tuple(fk['constrained_columns']), fk['referred_table'], (fk['options'].get('ondelete') or '').upper())
+        for fk in inspector.get_foreign_keys(name)
+    }
+
+
+def rebuild_foreign_keys():
+    # SQLite cannot ALTER a constraint, so tables whose ON DELETE rules changed are copied into a fresh table
+    if db.engine.dialect.name != 'sqlite':
+        return
+    inspector = inspect(db.engine)
+    stale = [
+        table for table in db.metadata.sorted_tables
+        if inspector.has_table(table.name) and _foreign_keys(table) != _existing_foreign_keys(inspector, table.name)
+    ]
+    if not stale:
+        return
+
+    with db.engine.connect() as conn:
+        # Must be switched off outside a transaction, otherwise SQLite ignores it
+        conn.execute(text("PRAGMA foreign_keys=OFF"))
+        conn.commit()
+        for table in stale:
+            columns = ', '.join(f'"{c.name}"' for c in table.columns)
+            conn.execute(text(f'CREATE TABLE "_old_{table.name}" AS SELECT * FROM "{table.name}"'))
+            conn.execute(text(f'DROP TABLE "{table.name}"'))
+            table.create(conn)
+            conn.execute(text(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "_old_{table.name}"'))
+            conn.execute(text(f'DROP TABLE "_old_{table.name}"'))
+            print(f"Rebuilt table {table.name}")
+        conn.commit()
+        conn.execute(text("PRAGMA foreign_keys=ON"))
+        conn.commit()
+
+
+def add_missing_indexes():
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def enable_incremental_vacuum():
+    # Lets the retention sweeper hand freed pages back with PRAGMA incremental_vacuum
+    if db.engine.dialect.name != 'sqlite':
+        return
+    with db.engine.connect() as conn:
+        if conn.execute(text("PRAGMA auto_vacuum")).scalar() != 2:
+            conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+            # Switching an existing database over only takes effect after a VACUUM
+            conn.execute(text("VACUUM"))
+            print("Enabled incremental vacuum")
+
 
 with app.app_context():
+    enable_incremental_vacuum()
     db.create_all()
+    add_missing_columns()
+    rebuild_foreign_keys()
+    add_missing_indexes()
+    with db.engine.begin() as conn:
+        create_search_index(conn)
     print("All tables created successfully")
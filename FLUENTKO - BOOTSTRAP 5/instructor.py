@@ -0,0 +1,514 @@
+from flask import Blueprint, Response, jsonify, render_template, request, redirect, url_for, session, flash, stream_with_context
+import uuid
+
+import click
+
+import live
+from auth import login_required
+from extensions import db
+from models import User, Course, Lesson, Scenario, StudentClass, PronunciationAttempt
+
+bp = Blueprint('instructor', __name__)
+
+
+@bp.route('/instructor/home')
+@login_required(role='instructor')
+def instructor_home():
+    courses = Course.query.filter_by(
+        instructor_id=session['user_id'],
+        is_archived=False
+    ).all()
+
+    classes = [
+        {
+            "code": c.code,
+            "name": c.name,
+            "subject": c.subject,
+            "instructor": c.instructor.name,
+            "image": "/static/img/Korean Words.jpg"
+        }
+        for c in courses
+    ]
+
+    return render_template('instructor/instructor-home.html', classes=classes)
+
+@bp.route('/instructor/teaching')
+@login_required(role='instructor')
+def instructor_teaching():
+    classes = Course.query.filter_by(
+        instructor_id=session['user_id'],
+        is_archived=False
+    ).all()
+
+    return render_template('instructor/instructor-teaching.html', classes=classes)
+
+
+@bp.route('/instructor/create-class', methods=['POST'])
+@login_required(role='instructor')
+def create_class():
+    name = request.form.get('name')
+    subject = request.form.get('subject')
+    section = request.form.get('section')
+    room = request.form.get('room')
+
+    if not name or not subject:
+        flash('Class name and subject are required', 'error')
+        return redirect(url_for('instructor.instructor_teaching'))
+
+    # Generate a simple class code
+    code = f"{name.lower().replace(' ', '-')}-{uuid.uuid4().hex[:6]}"
+
+    new_course = Course(
+    code=code,
+    name=name,
+    subject=subject,
+    section=section,
+    room=room,
+    instructor_id=session['user_id']
+    ) 
+
+
+    db.session.add(new_course)
+    db.session.commit()
+
+    flash('Class created successfully!', 'success')
+    return redirect(url_for('instructor.instructor_teaching'))
+
+@bp.route("/instructor/class/<class_code>")
+@login_required(role='instructor')
+def instructor_class(class_code):
+    course = Course.query.filter_by(
+        code=class_code,
+        instructor_id=session['user_id']
+    ).first_or_404()
+
+    lessons = [{"title": l.title, "posted": l.posted_on.strftime("%b %d, %Y")} for l in course.lessons]
+    
+    students = [
+        {"name": e.student.name, "id": e.student.id, "status": "Active"}  # you can calculate progress/score later
+        for e in course.enrollments
+    ]
+    
+    scenarios = [
+        {"id": s.id, "title": s.title, "description": s.description, "status": s.status, "type": s.type}
+        for s in course.scenarios
+    ]
+    
+    class_data = {"code": course.code, "name": course.name, "subject": course.subject, "instructor": course.instructor.name, "is_archived": course.is_archived}
+    
+    return render_template("instructor/instructor-class.html",
+                           class_data=class_data,
+                           lessons=lessons,
+                           students=students,
+                           teachers=[{"name": session.get("user"), "avatar": "/static/img/profile.jpg"}],
+                           scenarios=scenarios)
+
+@bp.route("/instructor/class/<class_code>/live")
+@login_required(role='instructor')
+def class_live(class_code):
+    course = Course.query.filter_by(
+        code=class_code,
+        instructor_id=session['user_id']
+    ).first_or_404()
+
+    sub = live.broker.subscribe(course.id)
+
+    # The stream can stay open for hours, so give the DB connection back now
+    db.session.remove()
+
+    if sub is None:
+        return jsonify({"error": "Too many live connections, try again later"}), 503
+
+    return Response(
+        live.event_stream(sub),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@bp.route('/instructor/students')
+@login_required(role='instructor')
+def instructor_students():
+    students = [
+        {
+            "name": "Kim Ji-hoon",
+            "id": "2023-00124",
+            "score": 87,
+            "progress": 75,
+            "status": "Active",
+            "last_active": "2 hours ago"
+        },
+        {
+            "name": "Lee Min-seo",
+            "id": "2023-00156",
+            "score": 92,
+            "progress": 90,
+            "status": "Excellent",
+            "last_active": "Yesterday"
+        },
+        {
+            "name": "Park Soo-jin",
+            "id": "2023-00189",
+            "score": 63,
+            "progress": 45,
+            "status": "Needs Attention",
+            "last_active": "3 days ago"
+        }
+    ]
+
+    return render_template(
+        'instructor/instructor-students.html',
+        students=students
+    )
+
+@bp.route("/instructor/archive")
+@login_required(role='instructor')
+def instructor_archive():
+    classes = Course.query.filter_by(
+        instructor_id=session['user_id'],
+        is_archived=True
+    ).all()
+
+    return render_template(
+        "instructor/instructor-archive.html",
+        classes=classes
+    )
+
+@bp.route('/instructor/class/<class_code>/archive', methods=['POST'])
+@login_required(role='instructor')
+def archive_class(class_code):
+    course = Course.query.filter_by(
+        code=class_code,
+        instructor_id=session['user_id']
+    ).first_or_404()
+
+    course.is_archived = True
+    db.session.commit()
+
+    flash("Class archived successfully.", "success")
+    return redirect(url_for('instructor.instructor_teaching'))
+
+@bp.route('/instructor/class/<class_code>/export')
+@login_required(role='instructor')
+def export_class(class_code):
+    from course_export import export_course, ndjson_gzip
+
+    course = Course.query.filter_by(
+        code=class_code,
+        instructor_id=session['user_id']
+    ).first_or_404()
+
+    # Rows are read and compressed while the response is sent, never held in memory
+    return Response(
+        stream_with_context(ndjson_gzip(export_course(course))),
+        mimetype='application/gzip',
+        headers={'Content-Disposition': f'attachment; filename="{course.code}.ndjson.gz"'}
+    )
+
+@bp.route('/instructor/import', methods=['POST'])
+@login_required(role='instructor')
+def import_class():
+    from course_export import IMPORT_ERRORS, import_course, open_export
+
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash("Choose an export file to import.", "danger")
+        return redirect(url_for('instructor.instructor_archive'))
+
+    instructor = db.session.get(User, session['user_id'])
+    try:
+        course, _ = import_course(open_export(upload.stream), instructor)
+    except IMPORT_ERRORS as e:
+        db.session.rollback()
+        # First line only: database errors carry the whole statement after it
+        reason = str(e).partition('\n')[0]
+        flash(f"Could not import class: {reason}", "danger")
+        return redirect(url_for('instructor.instructor_archive'))
+
+    flash(f"Imported {course.name}.", "success")
+    if course.is_archived:
+        return redirect(url_for('instructor.instructor_archive'))
+    return redirect(url_for('instructor.instructor_class', class_code=course.code))
+
+@bp.route('/instructor/class/<class_code>/update', methods=['POST'])
+@login_required(role='instructor')
+def update_class(class_code):
+    course = Course.query.filter_by(code=class_code, instructor_id=session['user_id']).first_or_404()
+
+    # Update fields
+    course.name = request.form.get('name')
+    course.subject = request.form.get('subject')
+    db.session.commit()
+
+    flash("Class updated successfully.", "success")
+    return redirect(url_for('instructor.instructor_class', class_code=class_code))
+
+@bp.route('/instructor/class/<class_code>/restore', methods=['POST'])
+@login_required(role='instructor')
+def restore_class(class_code):
+    course = Course.query.filter_by(
+        code=class_code,
+        instructor_id=session['user_id']
+    ).first_or_404()
+
+    course.is_archived = False
+    db.session.commit()
+
+    flash("Class restored successfully.", "success")
+    return redirect(url_for('instructor.instructor_archive'))
+
+@bp.route('/instructor/class/<class_code>/create-scenario', methods=['POST'])
+@login_required(role='instructor')
+def create_scenario(class_code):
+    course = Course.query.filter_by(
+        code=class_code,
+        instructor_id=session['user_id']
+    ).first_or_404()
+
+    data = request.get_json()
+    title = data.get('title')
+    description = data.get('description')
+    scenario_type = data.get('type')
+    status = 'Draft'
+
+    if not title or not scenario_type:
+        return {"success": False, "message": "Title and type are required"}, 400
+
+    new_scenario = Scenario(
+        course_id=course.id,
+        title=title,
+        description=description,
+        type=scenario_type,
+        status=status
+    )
+
+    db.session.add(new_scenario)
+    db.session.commit()
+
+    return {
+        "success": True,
+        "scenario": {
+            "id": new_scenario.id,
+            "title": new_scenario.title,
+            "description": new_scenario.description,
+            "status": new_scenario.status,
+            "type": new_scenario.type
+        }
+    }
+
+def get_own_scenario(scenario_id):
+    return (
+        Scenario.query
+        .join(Course)
+        .filter(Scenario.id == scenario_id, Course.instructor_id == session['user_id'])
+        .first()
+    )
+
+@bp.route('/instructor/scenario/<int:scenario_id>/delete', methods=['POST'])
+@login_required(role='instructor')
+def delete_scenario(scenario_id):
+    scenario = get_own_scenario(scenario_id)
+
+    if not scenario:
+        return jsonify({
+            "success": False,
+            "message": "Scenario not found"
+        }), 404
+
+    db.session.delete(scenario)
+    db.session.commit()
+
+    return jsonify({
+        "success": True
+    })
+
+@bp.route('/instructor/scenario/<int:scenario_id>/update', methods=['POST'])
+@login_required(role='instructor')
+def update_scenario(scenario_id):
+    scenario = get_own_scenario(scenario_id)
+
+    if not scenario:
+        return jsonify({"success": False, "message": "Scenario not found"}), 404
+
+    data = request.get_json()
+    title = data.get('title', scenario.title)
+    scenario_type = data.get('type', scenario.type)
+
+    if not title or not scenario_type:
+        return jsonify({"success": False, "message": "Title and type are required"}), 400
+
+    scenario.title = title
+    scenario.description = data.get('description', scenario.description)
+    scenario.type = scenario_type
+    # New version -> chats pick up a freshly compiled system prompt
+    scenario.version += 1
+    db.session.commit()
+
+    return jsonify({"success": True, "version": scenario.version})
+
+@bp.route('/instructor/scenario/<int:scenario_id>/status', methods=['POST'])
+@login_required(role='instructor')
+def set_scenario_status(scenario_id):
+    scenario = get_own_scenario(scenario_id)
+
+    if not scenario:
+        return jsonify({"success": False, "message": "Scenario not found"}), 404
+
+    status = request.get_json().get('status')
+    if status not in ('Draft', 'Published'):
+        return jsonify({"success": False, "message": "Status must be Draft or Published"}), 400
+
+    scenario.status = status
+    db.session.commit()
+
+    return jsonify({"success": True, "status": scenario.status})
+
+def class_attempts_query(course_id):
+    return (
+        PronunciationAttempt.query
+        .join(StudentClass, StudentClass.student_id == PronunciationAttempt.student_id)
+        .filter(StudentClass.course_id == course_id)
+    )
+
+@bp.route('/instructor/class/<class_code>/pronunciation')
+@login_required(role='instructor')
+def class_pronunciation(class_code):
+    course = Course.query.filter_by(
+        code=class_code,
+        instructor_id=session['user_id']
+    ).first_or_404()
+
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 500)
+    attempts = (
+        class_attempts_query(course.id)
+        .options(db.joinedload(PronunciationAttempt.student))
+        .order_by(PronunciationAttempt.created_on.desc())
+        .limit(limit)
+        .all()
+    )
+
+    return jsonify({
+        "attempts": [
+            {
+                "id": a.id,
+                "student": {"id": a.student.id, "name": a.student.name},
+                "target": a.target,
+                "transcript": a.transcript,
+                "score": a.score,
+                "syllables": a.syllables,
+                "created_on": a.created_on.isoformat() if a.created_on else None
+            }
+            for a in attempts
+        ]
+    })
+
+@bp.cli.command('rescore-pronunciation')
+@click.option('--course', 'class_code', help='Only attempts by students of this class.')
+@click.option('--workers', type=int, help='Worker processes (default: one per CPU).')
+@click.option('--batch-size', type=int, default=5000, show_default=True)
+def rescore_pronunciation(class_code, workers, batch_size):
+    # Re-run the local scorer over stored attempts, e.g. after the scoring rules change
+    from pronunciation import score_batch
+
+    query = PronunciationAttempt.query
+    if class_code:
+        course = Course.query.filter_by(code=class_code).first()
+        if not course:
+            raise click.BadParameter(f"No class with code {class_code}", param_hint='--course')
+        query = class_attempts_query(course.id)
+
+    last_id = 0
+    total = 0
+    while True:
+        attempts = (
+            query.filter(PronunciationAttempt.id > last_id)
+            .order_by(PronunciationAttempt.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not attempts:
+            break
+
+        results = score_batch([(a.target, a.transcript) for a in attempts], max_workers=workers)
+        for attempt, result in zip(attempts, results):
+            attempt.score = result["score"]
+            attempt.syllables = result["syllables"]
+        db.session.commit()
+
+        last_id = attempts[-1].id
+        total += len(attempts)
+
+    click.echo(f"Rescored {total} attempts")
+
+@bp.cli.command('generate-exercises')
+@click.option('--course', 'class_code', help='Only lessons of this class.')
+@click.option('--ai', 'use_ai', is_flag=True, help='Write the items with the AI model instead of from the lesson text.')
+@click.option('--replace', is_flag=True, help='Rebuild item banks that already exist. Items are updated in place by position, so review progress is kept except on items the new bank drops.')
+def generate_exercises(class_code, use_ai, replace):
+    # Meant to run as a background batch job, so students never wait on item generation
+    from exercises import generate_item_bank
+
+    query = Lesson.query
+    if class_code:
+        course = Course.query.filter_by(code=class_code).first()
+        if not course:
+            raise click.BadParameter(f"No class with code {class_code}", param_hint='--course')
+        query = query.filter_by(course_id=course.id)
+
+    total = 0
+    for lesson in query.order_by(Lesson.id):
+        created = generate_item_bank(lesson, use_ai=use_ai, replace=replace)
+        db.session.commit()
+        if created:
+            click.echo(f"{lesson.title}: {created} items")
+        total += created
+
+    click.echo(f"Generated {total} exercise items")
+
+@bp.cli.command('export-class')
+@click.argument('class_code')
+@click.option('-o', '--output', type=click.Path(dir_okay=False, writable=True), help='File to write (default: CODE.ndjson.gz).')
+@click.option('--include-passwords', is_flag=True, help='Keep student password hashes so they can log in after an import.')
+def export_class_command(class_code, output, include_passwords):
+    # End-of-term archive of one class: lessons, scenarios, enrollments and chat transcripts
+    from course_export import export_course, ndjson_gzip
+
+    course = Course.query.filter_by(code=class_code).first()
+    if not course:
+        raise click.BadParameter(f"No class with code {class_code}", param_hint='CLASS_CODE')
+
+    output = output or f"{course.code}.ndjson.gz"
+    with open(output, 'wb') as f:
+        for chunk in ndjson_gzip(export_course(course, include_passwords=include_passwords)):
+            f.write(chunk)
+
+    click.echo(f"Exported {course.code} to {output}")
+
+@bp.cli.command('import-class')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--instructor', 'email', required=True, help='Email of the instructor who will own the class.')
+def import_class_command(path, email):
+    from course_export import IMPORT_ERRORS, import_course, open_export
+
+    instructor = User.query.filter_by(email=email, role='instructor').first()
+    if not instructor:
+        raise click.BadParameter(f"No instructor with email {email}", param_hint='--instructor')
+
+    with open(path, 'rb') as f:
+        try:
+            # Run by an admin: existing students are matched by email and keep their chats
+            course, counts = import_course(open_export(f), instructor, trusted=True)
+        except IMPORT_ERRORS as e:
+            db.session.rollback()
+            raise click.ClickException(f"Could not import {path}: {e}")
+
+    click.echo(f"Imported {course.code}: " + ", ".join(f"{n} {kind}" for kind, n in counts.items() if kind != 'header'))
+
+@bp.route('/instructor/profile')
+@login_required(role='instructor')
+def instructor_profile():
+    return render_template('instructor/instructor-profile.html')
+
+@bp.route('/instructor/settings')
+@login_required(role='instructor')
+def instructor_settings():
+    return render_template('instructor/instructor-settings.html')
@@ -0,0 +1,242 @@
+import json
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, select
+
+from extensions import db
+from models import User, Chat, Message, Scenario, StudentClass
+
+# Live classroom activity: new messages in a class's scenario chats and enrollment
+# changes are published per course after the transaction commits and fanned out to
+# every connected instructor dashboard (Server-Sent Events, see instructor.class_live).
+# Free-practice chats belong to the student, not to a class, and are never published.
+
+
+class Subscriber:
+    # Each connection gets a bounded queue: a slow client loses its oldest events
+    # (and is told how many) instead of holding up publishers or growing memory.
+
+    def __init__(self, topic, max_queue=500):
+        self.topic = topic
+        self.events = deque(maxlen=max_queue)
+        self.dropped = 0
+        self.cond = threading.Condition()
+
+    def put(self, item):
+        with self.cond:
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append(item)
+            self.cond.notify()
+
+    def get_batch(self, timeout, window=0.25, max_batch=100):
+        # Wait up to timeout for the first event, then up to window for more,
+        # so bursts go out as one SSE message instead of many tiny writes
+        with self.cond:
+            if not self.events:
+                self.cond.wait(timeout)
+            if self.events:
+                deadline = time.monotonic() + window
+                while len(self.events) < max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self.cond.wait(remaining):
+                        break
+            batch = [self.events.popleft() for _ in range(min(len(self.events), max_batch))]
+            dropped, self.dropped = self.dropped, 0
+        return batch, dropped
+
+
+class LocalBroker:
+    def __init__(self, max_subscribers=500):
+        self.max_subscribers = max_subscribers
+        self.topics = {}
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def subscribe(self, topic):
+        with self.lock:
+            if self.count >= self.max_subscribers:
+                return None
+            sub = Subscriber(topic)
+            self.topics.setdefault(topic, set()).add(sub)
+            self.count += 1
+            return sub
+
+    def unsubscribe(self, sub):
+        with self.lock:
+            subs = self.topics.get(sub.topic)
+            if subs and sub in subs:
+                subs.discard(sub)
+                self.count -= 1
+                if not subs:
+                    del self.topics[sub.topic]
+
+    def has_subscribers(self):
+        return self.count > 0
+
+    def publish(self, topic, item):
+        self.deliver(topic, item)
+
+    def deliver(self, topic, item):
+        with self.lock:
+            subs = list(self.topics.get(topic, ()))
+        for sub in subs:
+            sub.put(item)
+
+
+class RedisBroker(LocalBroker):
+    # Stand-in for a shared broker when several worker processes serve dashboards:
+    # events go through Redis pub/sub and one listener thread per process hands them
+    # to the local subscribers. Requires the optional `redis` package.
+
+    CHANNEL_PREFIX = 'fluentko:course:'
+    # How long a "does anyone listen" answer is reused before asking Redis again
+    PRESENCE_TTL = 1.0
+
+    def __init__(self, url, max_subscribers=500):
+        super().__init__(max_subscribers)
+        import redis
+        self.redis = redis.Redis.from_url(url)
+        self.listener = None
+        self.presence = (0.0, True)
+
+    def has_subscribers(self):
+        # Every flush that writes a message asks this, and a yes costs two extra SELECTs.
+        # Listener threads only hold their pattern subscription while their process has
+        # dashboards open, so PUBSUB NUMPAT tells whether any process does. It counts
+        # every pattern subscription on the Redis server, so it can only err towards yes.
+        if self.count:
+            return True
+        checked_at, active = self.presence
+        now = time.monotonic()
+        if now - checked_at > self.PRESENCE_TTL:
+            try:
+                active = self.redis.pubsub_numpat() > 0
+            except Exception as e:
+                print("LIVE ERROR:", e)
+                active = True
+            self.presence = (now, active)
+        return active
+
+    def publish(self, topic, item):
+        self.redis.publish(f'{self.CHANNEL_PREFIX}{topic}', json.dumps(item, ensure_ascii=False))
+
+    def subscribe(self, topic):
+        sub = super().subscribe(topic)
+        if sub is not None:
+            with self.lock:
+                if self.listener is None:
+                    self.listener = threading.Thread(target=self._listen, name='live-broker', daemon=True)
+                    self.listener.start()
+        return sub
+
+    def _listen(self):
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f'{self.CHANNEL_PREFIX}*')
+        try:
+            while True:
+                # Drop the subscription once the last local dashboard is gone
+                with self.lock:
+                    if self.count == 0:
+                        self.listener = None
+                        break
+                message = pubsub.get_message(timeout=1.0)
+                if message:
+                    topic = int(message['channel'].decode().rsplit(':', 1)[1])
+                    self.deliver(topic, json.loads(message['data']))
+        finally:
+            pubsub.close()
+
+
+broker = None
+
+
+def init_broker(app):
+    global broker
+    if broker is None:
+        url = app.config.get('LIVE_BROKER_URL')
+        max_subscribers = app.config.get('LIVE_MAX_CONNECTIONS', 500)
+        broker = RedisBroker(url, max_subscribers) if url else LocalBroker(max_subscribers)
+    return broker
+
+
+# Collect events while the transaction is open, publish only once it commits
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_events(session, flush_context):
+    if broker is None or not broker.has_subscribers():
+        return
+
+    pending = session.info.setdefault('live_events', [])
+
+    messages = [obj for obj in session.new if isinstance(obj, Message)]
+    if messages:
+        # Inner join on Scenario: only scenario chats belong to a class
+        chat_rows = session.execute(
+            select(Chat.id, Chat.title, Chat.student_id, User.name, Scenario.course_id)
+            .join(User, User.id == Chat.student_id)
+            .join(Scenario, Scenario.id == Chat.scenario_id)
+            .where(Chat.id.in_({m.chat_id for m in messages}))
+        ).all()
+        chats = {row.id: row for row in chat_rows}
+        for m in messages:
+            chat = chats.get(m.chat_id)
+            if not chat:
+                continue
+            item = {
+                "type": "message",
+                "chat_id": chat.id,
+                "chat_title": chat.title,
+                "student": {"id": chat.student_id, "name": chat.name},
+                "sender": m.sender,
+                "content": m.content[:200],
+            }
+            pending.append((chat.course_id, item))
+
+    enrollments = [(obj, 'joined') for obj in session.new if isinstance(obj, StudentClass)]
+    enrollments += [(obj, 'left') for obj in session.deleted if isinstance(obj, StudentClass)]
+    if enrollments:
+        names = dict(session.execute(
+            select(User.id, User.name).where(User.id.in_({e.student_id for e, _ in enrollments}))
+        ).all())
+        for e, action in enrollments:
+            pending.append((e.course_id, {
+                "type": "enrollment",
+                "action": action,
+                "student": {"id": e.student_id, "name": names.get(e.student_id)},
+            }))
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publish_events(session):
+    pending = session.info.pop('live_events', None)
+    if not pending or broker is None:
+        return
+    for topic, item in pending:
+        try:
+            broker.publish(topic, item)
+        except Exception as e:
+            # Live updates are best effort; never fail the request that wrote the data
+            print("LIVE ERROR:", e)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_events(session):
+    session.info.pop('live_events', None)
+
+
+def event_stream(sub, heartbeat=15):
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            batch, dropped = sub.get_batch(timeout=heartbeat)
+            if dropped:
+                yield f"event: overflow\ndata: {json.dumps({'dropped': dropped})}\n\n"
+            if batch:
+                yield f"data: {json.dumps(batch, ensure_ascii=False)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+    finally:
+        broker.unsubscribe(sub)
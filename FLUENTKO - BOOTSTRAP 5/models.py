@@ -0,0 +1,204 @@
+from sqlalchemy import event, text
+
+from extensions import db
+
+
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(150), nullable=False)
+    email = db.Column(db.String(150), unique=True, nullable=False)
+    password = db.Column(db.String(150), nullable=False)
+    role = db.Column(db.String(20), nullable=False)  # 'student' or 'instructor'
+
+class Course(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(20), unique=True, nullable=False)
+    name = db.Column(db.String(150), nullable=False)
+    subject = db.Column(db.String(150), nullable=False)
+    instructor_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    section = db.Column(db.String(50))
+    room = db.Column(db.String(50))
+
+    is_archived = db.Column(db.Boolean, default=False)
+    
+    instructor = db.relationship('User', backref='courses_taught')
+
+class Lesson(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id', ondelete='CASCADE'), nullable=False)
+    title = db.Column(db.String(150), nullable=False)
+    content = db.Column(db.Text, nullable=True)
+    posted_on = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    course = db.relationship('Course', backref=db.backref('lessons', cascade='all, delete-orphan', passive_deletes=True))
+
+class Scenario(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id', ondelete='CASCADE'), nullable=False)
+    title = db.Column(db.String(150), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), default='Draft')  # Draft / Published
+    type = db.Column(db.String(50))  # e.g., 'restaurant', 'bank'
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # bumped on every edit
+
+    course = db.relationship('Course', backref=db.backref('scenarios', cascade='all, delete-orphan', passive_deletes=True))
+
+class Chat(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+    scenario_id = db.Column(db.Integer, db.ForeignKey('scenario.id', ondelete='SET NULL'), nullable=True, index=True)
+    title = db.Column(db.String(150), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    difficulty = db.Column(db.String(50))
+    character = db.Column(db.String(50))
+    background = db.Column(db.String(50), default='chat-bg1.png')
+    created_on = db.Column(db.DateTime, default=db.func.current_timestamp(), index=True)
+
+    student = db.relationship('User', backref=db.backref('chats', cascade='all, delete-orphan', passive_deletes=True))
+    # The database nulls scenario_id when a scenario is deleted (ON DELETE SET NULL)
+    scenario = db.relationship('Scenario', backref=db.backref('chats', passive_deletes=True))
+
+class Message(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    chat_id = db.Column(db.Integer, db.ForeignKey('chat.id', ondelete='CASCADE'), nullable=False)
+    sender = db.Column(db.String(20), nullable=False)  # 'user' or 'ai'
+    content = db.Column(db.Text, nullable=False)
+    created_on = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    chat = db.relationship('Chat', backref=db.backref('messages', cascade='all, delete-orphan', passive_deletes=True))
+
+    __table_args__ = (
+        # Chat history is always read by chat in time order
+        db.Index('ix_message_chat_created', 'chat_id', 'created_on'),
+    )
+
+class ExerciseItem(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    lesson_id = db.Column(db.Integer, db.ForeignKey('lesson.id', ondelete='CASCADE'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    kind = db.Column(db.String(20), nullable=False)  # 'cloze' or 'choice'
+    prompt = db.Column(db.Text, nullable=False)
+    answer = db.Column(db.String(150), nullable=False)
+    choices = db.Column(db.JSON)  # answer options for 'choice' items
+
+    lesson = db.relationship('Lesson', backref=db.backref('exercise_items', cascade='all, delete-orphan', passive_deletes=True, order_by='ExerciseItem.position'))
+
+class ExerciseReview(db.Model):
+    # Spaced-repetition state of one item for one student
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('exercise_item.id', ondelete='CASCADE'), nullable=False)
+    due_on = db.Column(db.DateTime, nullable=False)
+    interval_days = db.Column(db.Float, nullable=False, default=0)
+    ease = db.Column(db.Float, nullable=False, default=2.5)
+    repetitions = db.Column(db.Integer, nullable=False, default=0)
+    lapses = db.Column(db.Integer, nullable=False, default=0)
+    last_reviewed = db.Column(db.DateTime)
+
+    item = db.relationship('ExerciseItem')
+
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'item_id', name='unique_review'),
+        # "What is due for this student" is answered from this index alone
+        db.Index('ix_exercise_review_student_due', 'student_id', 'due_on'),
+    )
+
+class PronunciationAttempt(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+    chat_id = db.Column(db.Integer, db.ForeignKey('chat.id', ondelete='SET NULL'), nullable=True)
+    target = db.Column(db.Text, nullable=False)  # phrase the student was asked to say
+    transcript = db.Column(db.Text, nullable=False)
+    score = db.Column(db.Integer, nullable=False)  # 0-100
+    syllables = db.Column(db.JSON)  # per-syllable scores from pronunciation.score_pronunciation
+    created_on = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    student = db.relationship('User', backref=db.backref('pronunciation_attempts', cascade='all, delete-orphan', passive_deletes=True))
+
+class StudentClass(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id', ondelete='CASCADE'), nullable=False)
+
+    student = db.relationship('User', backref=db.backref('enrollments', cascade='all, delete-orphan', passive_deletes=True))
+    course = db.relationship('Course', backref=db.backref('enrollments', cascade='all, delete-orphan', passive_deletes=True))
+
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'course_id', name='unique_enrollment'),
+    )
+
+
+# Full-text search over lessons, chats and messages (SQLite FTS5).
+# The trigram tokenizer matches any 3+ character substring, which suits Korean
+# where particles are attached to words (커피를, 커피가 ...). Rows are keyed by
+# rowid = id * 4 + kind so results map straight back to their source row.
+SEARCH_KINDS = {'lesson': 1, 'chat': 2, 'message': 3}
+
+SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        title, body,
+        kind UNINDEXED, ref_id UNINDEXED, chat_id UNINDEXED, course_id UNINDEXED, student_id UNINDEXED,
+        tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS lesson_search_insert AFTER INSERT ON lesson BEGIN
+        INSERT INTO search_index(rowid, title, body, kind, ref_id, course_id)
+        VALUES (new.id * 4 + 1, new.title, coalesce(new.content, ''), 'lesson', new.id, new.course_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS lesson_search_update AFTER UPDATE OF title, content, course_id ON lesson BEGIN
+        UPDATE search_index SET title = new.title, body = coalesce(new.content, ''), course_id = new.course_id
+        WHERE rowid = new.id * 4 + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS lesson_search_delete AFTER DELETE ON lesson BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS chat_search_insert AFTER INSERT ON chat BEGIN
+        INSERT INTO search_index(rowid, title, body, kind, ref_id, chat_id, student_id)
+        VALUES (new.id * 4 + 2, new.title, new.description, 'chat', new.id, new.id, new.student_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS chat_search_update AFTER UPDATE OF title, description ON chat BEGIN
+        UPDATE search_index SET title = new.title, body = new.description WHERE rowid = new.id * 4 + 2;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS chat_search_delete AFTER DELETE ON chat BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS message_search_insert AFTER INSERT ON message BEGIN
+        INSERT INTO search_index(rowid, title, body, kind, ref_id, chat_id, student_id)
+        VALUES (new.id * 4 + 3, '', new.content, 'message', new.id, new.chat_id,
+                (SELECT student_id FROM chat WHERE id = new.chat_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS message_search_update AFTER UPDATE OF content ON message BEGIN
+        UPDATE search_index SET body = new.content WHERE rowid = new.id * 4 + 3;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS message_search_delete AFTER DELETE ON message BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+    END""",
+]
+
+SEARCH_INDEX_BACKFILL = [
+    """INSERT INTO search_index(rowid, title, body, kind, ref_id, course_id)
+       SELECT id * 4 + 1, title, coalesce(content, ''), 'lesson', id, course_id FROM lesson""",
+    """INSERT INTO search_index(rowid, title, body, kind, ref_id, chat_id, student_id)
+       SELECT id * 4 + 2, title, description, 'chat', id, id, student_id FROM chat""",
+    """INSERT INTO search_index(rowid, title, body, kind, ref_id, chat_id, student_id)
+       SELECT message.id * 4 + 3, '', message.content, 'message', message.id, message.chat_id, chat.student_id
+       FROM message JOIN chat ON chat.id = message.chat_id""",
+]
+
+
+def create_search_index(connection):
+    # Idempotent: also recreates triggers dropped when a table is rebuilt by init_db.py
+    if connection.dialect.name != 'sqlite':
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+    ).first()
+    for ddl in SEARCH_INDEX_DDL:
+        connection.execute(text(ddl))
+    if not exists:
+        for sql in SEARCH_INDEX_BACKFILL:
+            connection.execute(text(sql))
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_search_index(target, connection, **kw):
+    create_search_index(connection)
@@ -0,0 +1,89 @@
+import threading
+
+# The system prompt is assembled from the most shared part to the most specific,
+# so every student in a class running the same scenario sends an identical prefix
+# and the upstream prompt cache can reuse it.
+
+BASE_INSTRUCTIONS = (
+    "You are a Korean conversation partner in Fluentko, a language learning app.\n"
+    "Stay in the role and setting described below and keep the conversation going.\n"
+    "Reply mainly in Korean. Keep each reply short (one to three sentences) and end with "
+    "something the student can respond to.\n"
+    "If the student makes a mistake, continue naturally and model the correct form in your reply "
+    "instead of lecturing.\n"
+    "If the student writes in English, answer in simple Korean and add a short English hint in brackets."
+)
+
+DIFFICULTY_GUIDES = {
+    'beginner': (
+        "Difficulty: Beginner. Use polite 해요체, basic vocabulary and short, simple sentences. "
+        "Add the English meaning of new words in brackets."
+    ),
+    'intermediate': (
+        "Difficulty: Intermediate. Use everyday vocabulary and common grammar patterns at natural speed. "
+        "Only give English hints when the student is clearly stuck."
+    ),
+    'advanced': (
+        "Difficulty: Advanced. Speak naturally, including idioms and switching between 존댓말 and 반말 "
+        "where the situation calls for it. Do not use English."
+    ),
+}
+
+CHARACTER_PERSONAS = {
+    'poly': "Character: You are Poly, a warm big-sister guide who encourages the student and praises progress.",
+    'nabi': "Character: You are Nabi, a simple and gentle practice partner who speaks slowly and patiently.",
+    'min': "Character: You are Min, a friendly peer who keeps things casual and relaxed.",
+}
+
+MAX_COMPILED_PROMPTS = 1024
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def _join(*parts):
+    return "\n\n".join(part for part in parts if part)
+
+
+def _scenario_block(title, scenario_type, description):
+    lines = [f"Scenario: {title}"]
+    if scenario_type:
+        lines.append(f"Setting: {scenario_type}")
+    if description:
+        lines.append(description)
+    return "\n".join(lines)
+
+
+def compile_system_prompt(scenario, difficulty=None, character=None):
+    return _join(
+        BASE_INSTRUCTIONS,
+        _scenario_block(scenario.title, scenario.type, scenario.description),
+        DIFFICULTY_GUIDES.get(difficulty),
+        CHARACTER_PERSONAS.get(character),
+    )
+
+
+def get_scenario_prompt(scenario, difficulty=None, character=None):
+    # Scenario.version is bumped on every edit, so stale entries are never looked up again
+    key = (scenario.id, scenario.version, difficulty, character)
+    prompt = _compiled.get(key)
+    if prompt is None:
+        prompt = compile_system_prompt(scenario, difficulty, character)
+        with _compiled_lock:
+            if len(_compiled) >= MAX_COMPILED_PROMPTS:
+                _compiled.clear()
+            _compiled[key] = prompt
+    return prompt
+
+
+def system_prompt_for(chat):
+    if chat.scenario is not None:
+        return get_scenario_prompt(chat.scenario, chat.difficulty, chat.character)
+
+    # Free practice: the student's own prompt takes the place of the scenario text
+    return _join(
+        BASE_INSTRUCTIONS,
+        _scenario_block(chat.title, None, chat.description),
+        DIFFICULTY_GUIDES.get(chat.difficulty),
+        CHARACTER_PERSONAS.get(chat.character),
+    )
@@ -0,0 +1,114 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Local pronunciation scoring: the transcript of a recording is aligned to the
+# phrase the student was asked to say, syllable by syllable, and each Hangul
+# syllable is compared by its jamo (initial, medial, final). Runs on CPU only.
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+N_MEDIALS = 21
+N_FINALS = 28
+
+INDEL_COST = 1.0
+
+
+def normalize(text):
+    # Spacing, punctuation and letter case are not pronounced
+    return [ch for ch in (text or '').casefold() if ch.isalnum()]
+
+
+def decompose(chars):
+    # One (initial, medial, final) row per character; non-Hangul characters get
+    # their negated code in all three columns so they only ever match themselves
+    codes = np.array([ord(ch) for ch in chars], dtype=np.int64)
+    jamo = np.empty((len(codes), 3), dtype=np.int64)
+    hangul = (codes >= HANGUL_BASE) & (codes <= HANGUL_LAST)
+    offset = codes - HANGUL_BASE
+    jamo[:, 0] = np.where(hangul, offset // (N_MEDIALS * N_FINALS), -codes)
+    jamo[:, 1] = np.where(hangul, (offset // N_FINALS) % N_MEDIALS, -codes)
+    jamo[:, 2] = np.where(hangul, offset % N_FINALS, -codes)
+    return jamo
+
+
+def substitution_costs(target, heard):
+    # Fraction of jamo that differ, for every (target, heard) syllable pair at once
+    return (target[:, None, :] != heard[None, :, :]).mean(axis=2)
+
+
+def align(costs):
+    n, m = costs.shape
+    steps = np.arange(m + 1) * INDEL_COST
+    dist = np.empty((n + 1, m + 1))
+    dist[0] = steps
+    for i in range(1, n + 1):
+        prev = dist[i - 1]
+        row = np.empty(m + 1)
+        row[0] = prev[0] + INDEL_COST
+        row[1:] = np.minimum(prev[1:] + INDEL_COST, prev[:-1] + costs[i - 1])
+        # Insertions chain along the row: row[j] = min_k(row[k] + (j - k)), as a running minimum
+        dist[i] = np.minimum.accumulate(row - steps) + steps
+
+    # Walk back to recover which heard syllable (if any) each target syllable was matched to
+    matched = np.full(n, -1)
+    insertions = 0
+    i, j = n, m
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and np.isclose(dist[i, j], dist[i - 1, j - 1] + costs[i - 1, j - 1]):
+            matched[i - 1] = j - 1
+            i, j = i - 1, j - 1
+        elif i > 0 and np.isclose(dist[i, j], dist[i - 1, j] + INDEL_COST):
+            i -= 1
+        else:
+            insertions += 1
+            j -= 1
+    return matched, insertions, float(dist[n, m])
+
+
+def score_pronunciation(target, transcript):
+    target_chars = normalize(target)
+    heard_chars = normalize(transcript)
+    if not target_chars:
+        return {"score": 0, "syllables": [], "edit_distance": float(len(heard_chars))}
+
+    target_jamo = decompose(target_chars)
+    if heard_chars:
+        costs = substitution_costs(target_jamo, decompose(heard_chars))
+        matched, insertions, distance = align(costs)
+    else:
+        costs = np.ones((len(target_chars), 0))
+        matched, insertions, distance = np.full(len(target_chars), -1), 0, float(len(target_chars))
+
+    has_match = matched >= 0
+    scores = np.zeros(len(target_chars))
+    scores[has_match] = 1.0 - costs[np.nonzero(has_match)[0], matched[has_match]]
+
+    # Extra syllables the student added count against the overall score
+    overall = scores.sum() / (len(target_chars) + insertions)
+
+    return {
+        "score": int(round(overall * 100)),
+        "edit_distance": round(distance, 3),
+        "syllables": [
+            {
+                "syllable": ch,
+                "heard": heard_chars[k] if k >= 0 else None,
+                "score": round(float(s), 3),
+            }
+            for ch, k, s in zip(target_chars, matched.tolist(), scores)
+        ],
+    }
+
+
+def _score_pair(pair):
+    return score_pronunciation(*pair)
+
+
+def score_batch(pairs, max_workers=None, chunksize=64):
+    # (target, transcript) pairs -> results in the same order; small batches skip the pool start-up
+    pairs = list(pairs)
+    if len(pairs) <= chunksize or max_workers == 1:
+        return [score_pronunciation(t, h) for t, h in pairs]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_score_pair, pairs, chunksize=chunksize))
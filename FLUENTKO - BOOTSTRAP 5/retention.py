@@ -0,0 +1,157 @@
+import gzip
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import text
+
+from extensions import db
+from models import Chat, Message
+
+
+def expired_chat_ids(cutoff, limit):
+    # A chat expires once it was created before the cutoff and has had no messages since
+    recent_message = (
+        db.session.query(Message.id)
+        .filter(Message.chat_id == Chat.id, Message.created_on >= cutoff)
+        .exists()
+    )
+    rows = (
+        db.session.query(Chat.id)
+        .filter(Chat.created_on < cutoff)
+        .filter(~recent_message)
+        .order_by(Chat.id)
+        .limit(limit)
+        .all()
+    )
+    return [row.id for row in rows]
+
+
+def archive_chats(chat_ids, archive_path):
+    # One JSON object per line so archives can be appended to and streamed back
+    chats = Chat.query.filter(Chat.id.in_(chat_ids)).order_by(Chat.id).all()
+    messages = (
+        Message.query
+        .filter(Message.chat_id.in_(chat_ids))
+        .order_by(Message.chat_id, Message.created_on, Message.id)
+        .all()
+    )
+    by_chat = {}
+    for m in messages:
+        by_chat.setdefault(m.chat_id, []).append({
+            "sender": m.sender,
+            "content": m.content,
+            "created_on": m.created_on.isoformat() if m.created_on else None,
+        })
+
+    with gzip.open(archive_path, 'at', encoding='utf-8') as f:
+        for c in chats:
+            f.write(json.dumps({
+                "id": c.id,
+                "student_id": c.student_id,
+                "scenario_id": c.scenario_id,
+                "title": c.title,
+                "description": c.description,
+                "difficulty": c.difficulty,
+                "character": c.character,
+                "created_on": c.created_on.isoformat() if c.created_on else None,
+                "messages": by_chat.get(c.id, []),
+            }, ensure_ascii=False) + "\n")
+
+
+def sweep_chats(max_age_days, batch_size=200, archive_path=None, pause=0.0):
+    # Delete (optionally archiving first) chats idle for max_age_days, one small batch per transaction
+    # created_on is stored as naive UTC (CURRENT_TIMESTAMP)
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=max_age_days)
+    removed = 0
+
+    while True:
+        chat_ids = expired_chat_ids(cutoff, batch_size)
+        if not chat_ids:
+            break
+
+        if archive_path:
+            archive_chats(chat_ids, archive_path)
+
+        # Messages go with their chat through ON DELETE CASCADE
+        Chat.query.filter(Chat.id.in_(chat_ids)).delete(synchronize_session=False)
+        db.session.commit()
+        removed += len(chat_ids)
+
+        # Short transactions plus a pause keep the writer lock free for requests
+        if pause:
+            time.sleep(pause)
+
+    if removed:
+        reclaim_space()
+    return removed
+
+
+def reclaim_space(full=False):
+    if db.engine.dialect.name != 'sqlite':
+        return
+    with db.engine.connect() as conn:
+        if full:
+            conn.execute(text("VACUUM"))
+        else:
+            # Only frees pages when users.db uses auto_vacuum=INCREMENTAL (set by init_db.py)
+            conn.execute(text("PRAGMA incremental_vacuum"))
+        conn.commit()
+
+
+@contextmanager
+def sweep_lock(path):
+    # Exclusive, non-blocking lock so overlapping sweeps (cron, a looping process,
+    # a manual run) never pick the same batch or append to the same archive at once.
+    # Yields False when another sweep holds it; the OS drops it if the process dies.
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a+b') as f:
+        try:
+            try:
+                import fcntl
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except ImportError:
+                import msvcrt
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+        yield True
+
+
+@click.command('sweep-chats')
+@click.option('--days', type=int, help='Delete chats with no activity for this many days (default: CHAT_RETENTION_DAYS).')
+@click.option('--batch-size', type=int, default=200, show_default=True)
+@click.option('--archive', 'archive_path', help='Append removed chats to this .jsonl.gz file first (default: CHAT_ARCHIVE_PATH).')
+@click.option('--vacuum', is_flag=True, help='Run a full VACUUM afterwards.')
+@click.option('--every', 'interval', type=int, help='Keep running as a dedicated process, sweeping every this many seconds.')
+@with_appcontext
+def sweep_chats_command(days, batch_size, archive_path, vacuum, interval):
+    # Runs only when started explicitly (cron or one dedicated process), never from the app factory
+    days = days or current_app.config.get('CHAT_RETENTION_DAYS')
+    if not days:
+        raise click.UsageError("Pass --days or set CHAT_RETENTION_DAYS")
+    archive_path = archive_path or current_app.config.get('CHAT_ARCHIVE_PATH')
+    lock_path = current_app.config.get('RETENTION_LOCK_PATH') or os.path.join(current_app.instance_path, 'sweep-chats.lock')
+
+    while True:
+        with sweep_lock(lock_path) as acquired:
+            if not acquired:
+                click.echo("Another sweep is running, skipping")
+            else:
+                try:
+                    removed = sweep_chats(days, batch_size=batch_size, archive_path=archive_path,
+                                          pause=0.1 if interval else 0.0)
+                    if vacuum:
+                        reclaim_space(full=True)
+                    click.echo(f"Removed {removed} chats")
+                finally:
+                    db.session.remove()
+        if not interval:
+            break
+        time.sleep(interval)
@@ -0,0 +1,222 @@
+import re
+
+from flask import Blueprint, jsonify, request, session
+from sqlalchemy import bindparam, text
+
+from auth import login_required
+from extensions import db
+from models import SEARCH_KINDS, User, Course, StudentClass, Chat
+
+bp = Blueprint('search', __name__)
+
+MAX_PER_PAGE = 50
+
+# Trigram tokens are 3 characters; shorter terms (common in Korean: 커피, 학교) cannot use the index
+MIN_INDEXED_TERM = 3
+
+
+def split_terms(query):
+    terms = [t for t in query.split() if t]
+    long_terms = [t for t in terms if len(t) >= MIN_INDEXED_TERM]
+    short_terms = [t for t in terms if len(t) < MIN_INDEXED_TERM]
+    return long_terms, short_terms
+
+
+def match_expression(terms):
+    # Quote every term so user input is never parsed as FTS5 query syntax
+    return ' '.join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def search_scope(course_code=None):
+    # Lessons are visible by course. Students see all their own chats; instructors see the
+    # chats students of their classes had on those classes' scenarios (never free practice,
+    # which belongs to the student, nor scenarios of other instructors' classes).
+    # Returns (lesson course ids, student ids whose chats are visible, course ids whose scenario chats are visible).
+    if session['role'] == 'instructor':
+        courses = Course.query.filter_by(instructor_id=session['user_id'])
+        if course_code:
+            courses = courses.filter_by(code=course_code)
+        course_ids = [c.id for c in courses.with_entities(Course.id)]
+        return course_ids, [], course_ids
+
+    enrollments = db.session.query(StudentClass.course_id).filter_by(student_id=session['user_id'])
+    if course_code:
+        enrollments = enrollments.join(Course).filter(Course.code == course_code)
+    course_ids = [row.course_id for row in enrollments]
+    return course_ids, [session['user_id']], []
+
+
+# Scopes up to this many rows are scanned directly (about a microsecond per row); larger
+# ones go through the FTS index, where cost follows the term's matches in the whole database
+SCAN_SCOPE_LIMIT = 50000
+
+SCOPE_CHATS = """
+    SELECT id FROM chat WHERE student_id IN :student_ids
+    UNION ALL
+    SELECT chat.id FROM chat
+    JOIN scenario ON scenario.id = chat.scenario_id
+    JOIN student_class ON student_class.student_id = chat.student_id
+                      AND student_class.course_id = scenario.course_id
+    WHERE scenario.course_id IN :scenario_course_ids
+"""
+
+SCOPE_ROWS = """
+    SELECT id * 4 + 1 AS rid, 'lesson' AS kind, id AS ref_id, NULL AS chat_id, course_id,
+           NULL AS student_id, title, coalesce(content, '') AS body, posted_on AS created_on
+    FROM lesson WHERE course_id IN :course_ids
+    UNION ALL
+    SELECT id * 4 + 2, 'chat', id, id, NULL, student_id, title, description, created_on
+    FROM chat WHERE id IN ({chats})
+    UNION ALL
+    SELECT message.id * 4 + 3, 'message', message.id, message.chat_id, NULL, chat.student_id, '',
+           message.content, message.created_on
+    FROM message JOIN chat ON chat.id = message.chat_id WHERE chat.id IN ({chats})
+""".format(chats=SCOPE_CHATS)
+
+SCOPE_PARAMS = ('course_ids', 'student_ids', 'scenario_course_ids')
+
+
+def _statement(sql):
+    return text(sql).bindparams(*(bindparam(name, expanding=True) for name in SCOPE_PARAMS + ('kinds',)
+                                  if f':{name}' in sql))
+
+
+def scope_size(params, limit):
+    # Stops counting past the limit, so a large scope costs no more than a small one to measure
+    stmt = _statement(f"SELECT count(*) FROM (SELECT 1 FROM ({SCOPE_ROWS}) LIMIT :size_limit)")
+    return db.session.execute(stmt, dict(params, size_limit=limit + 1)).scalar()
+
+
+def occurrences(column, param):
+    return f"(length({column}) - length(replace({column}, :{param}, ''))) / length(:{param})"
+
+
+def run_search(query, scope, kinds, limit, offset):
+    long_terms, short_terms = split_terms(query)
+    course_ids, student_ids, scenario_course_ids = scope
+    params = {
+        'course_ids': course_ids or [-1],
+        'student_ids': student_ids or [-1],
+        'scenario_course_ids': scenario_course_ids or [-1],
+        'kinds': kinds,
+        'limit': limit,
+        'offset': offset,
+    }
+
+    # Pick the plan by scope size: ranking a common term means scoring all its matches
+    # in the database, while a student's own rows can be checked in a few milliseconds
+    scan = not long_terms or scope_size(params, SCAN_SCOPE_LIMIT) <= SCAN_SCOPE_LIMIT
+
+    filters, scores = [], []
+    for i, term in enumerate(short_terms + long_terms if scan else short_terms):
+        params[f'term{i}'] = term.lower()
+        # Case-insensitive like the trigram index (lower() only folds ASCII, as FTS5 does)
+        filters.append(f"instr(lower(title || ' ' || body), :term{i}) > 0")
+        # Same weights as the bm25() call below: a title match counts three times a body match
+        scores.append(f"3 * {occurrences('lower(title)', f'term{i}')} + {occurrences('lower(body)', f'term{i}')}")
+
+    if scan:
+        # Scan the caller's rows in the source tables, ranked by how often the terms occur, then newest first
+        sql = """
+            SELECT rid, kind, ref_id, chat_id, course_id, student_id, title, body, NULL AS excerpt
+            FROM ({scope})
+            WHERE kind IN :kinds
+              {filters}
+            ORDER BY {score} DESC, created_on DESC, rid DESC
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        # Large scope: ranked index lookup, then drop the rows outside the caller's scope
+        params['match'] = match_expression(long_terms)
+        sql = """
+            SELECT rowid AS rid, kind, ref_id, chat_id, course_id, student_id, title, body,
+                   snippet(search_index, 1, '[', ']', '…', 12) AS excerpt
+            FROM search_index
+            WHERE search_index MATCH :match
+              AND kind IN :kinds
+              AND ((kind = 'lesson' AND course_id IN :course_ids) OR chat_id IN ({chats}))
+              {filters}
+            ORDER BY bm25(search_index, 3.0, 1.0)
+            LIMIT :limit OFFSET :offset
+        """
+
+    sql = sql.format(
+        scope=SCOPE_ROWS,
+        chats=SCOPE_CHATS,
+        filters=''.join(f'AND {f} ' for f in filters),
+        score=' + '.join(scores) or '0',
+    )
+    return db.session.execute(_statement(sql), params).mappings().all()
+
+
+def make_excerpt(body, terms, width=40):
+    # Same shape as FTS5 snippet(): matches in [brackets], cut ends marked with …
+    if not body:
+        return ''
+    lowered = body.lower()
+    start = min((p for p in (lowered.find(t.lower()) for t in terms) if p >= 0), default=0)
+    start = max(start - width // 2, 0)
+    end = start + width * 2
+    excerpt = body[start:end]
+    if terms:
+        pattern = re.compile('|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+        excerpt = pattern.sub(lambda m: f'[{m.group(0)}]', excerpt)
+    return ('…' if start else '') + excerpt + ('…' if end < len(body) else '')
+
+
+@bp.route('/api/search')
+@login_required()
+def api_search():
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({"error": "Missing search query"}), 400
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), MAX_PER_PAGE)
+    kinds = [k for k in request.args.get('kind', ','.join(SEARCH_KINDS)).split(',') if k in SEARCH_KINDS]
+    if not kinds:
+        return jsonify({"error": "kind must be lesson, chat or message"}), 400
+
+    scope = search_scope(request.args.get('course'))
+
+    # One extra row tells us whether there is a next page without a COUNT(*)
+    rows = run_search(query, scope, kinds, per_page + 1, (page - 1) * per_page)
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    # Resolve display data for this page only
+    chat_ids = {r['chat_id'] for r in rows if r['chat_id']}
+    chats = {c.id: c for c in Chat.query.filter(Chat.id.in_(chat_ids))} if chat_ids else {}
+    course_ids_on_page = {r['course_id'] for r in rows if r['course_id']}
+    courses = {c.id: c for c in Course.query.filter(Course.id.in_(course_ids_on_page))} if course_ids_on_page else {}
+    student_ids_on_page = {r['student_id'] for r in rows if r['student_id']}
+    students = {}
+    if session['role'] == 'instructor' and student_ids_on_page:
+        students = {u.id: u for u in User.query.filter(User.id.in_(student_ids_on_page))}
+
+    long_terms, short_terms = split_terms(query)
+    results = []
+    for r in rows:
+        item = {
+            "kind": r['kind'],
+            "id": r['ref_id'],
+            "excerpt": r['excerpt'] or make_excerpt(r['body'], long_terms + short_terms),
+        }
+        if r['kind'] == 'lesson':
+            course = courses.get(r['course_id'])
+            item["title"] = r['title']
+            item["course"] = course.code if course else None
+        else:
+            chat = chats.get(r['chat_id'])
+            item["title"] = chat.title if chat else r['title']
+            item["chat_id"] = r['chat_id']
+            if r['student_id'] in students:
+                item["student"] = {"id": r['student_id'], "name": students[r['student_id']].name}
+        results.append(item)
+
+    return jsonify({
+        "results": results,
+        "page": page,
+        "per_page": per_page,
+        "has_more": has_more
+    })
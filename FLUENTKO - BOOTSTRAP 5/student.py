@@ -0,0 +1,453 @@
+from flask import Blueprint, jsonify, render_template, request, redirect, url_for, session, flash
+
+from auth import login_required
+from extensions import db
+from exercises import normalize_answer, schedule_review, utcnow
+from models import User, Course, Lesson, StudentClass, Scenario, Chat, Message, ExerciseItem, ExerciseReview
+
+bp = Blueprint('student', __name__)
+
+
+@bp.route('/student/home')
+@login_required(role='student')
+def student_home():
+    courses = (
+        db.session.query(Course)
+        .join(StudentClass)
+        .filter(StudentClass.student_id == session['user_id'])
+        .filter(Course.is_archived == False)
+        .all()
+    )
+
+    classes = [
+        {
+            "id": c.id,
+            "code": c.code,
+            "name": c.name,
+            "subject": c.subject,
+            "instructor": c.instructor.name,
+            "image": "/static/img/Korean Words.jpg"
+        }
+        for c in courses
+    ]
+
+    return render_template(
+        'student/student-home.html',
+        classes=classes
+    )
+
+@bp.route("/student/join-class", methods=["POST"])
+@login_required(role="student")
+def join_class():
+    class_code = request.form.get("class_code").strip()
+
+    course = Course.query.filter_by(code=class_code).first()
+
+    if not course:
+        flash("Invalid class code.", "danger")
+        return redirect(url_for("student.student_home"))
+
+    # Prevent duplicate enrollment
+    existing = StudentClass.query.filter_by(
+        student_id=session["user_id"],
+        course_id=course.id
+    ).first()
+
+    if existing:
+        flash("You are already enrolled in this class.", "info")
+        return redirect(url_for("student.student_class", class_code=course.code))
+
+    enrollment = StudentClass(
+        student_id=session["user_id"],
+        course_id=course.id
+    )
+
+    db.session.add(enrollment)
+    db.session.commit()
+
+    flash("Successfully joined the class!", "success")
+    return redirect(url_for("student.student_class", class_code=course.code))
+
+
+@bp.route("/student/class/<class_code>")
+@login_required(role="student")
+def student_class(class_code):
+    course = Course.query.filter_by(code=class_code).first_or_404()
+
+    enrollment = StudentClass.query.filter_by(
+        student_id=session["user_id"],
+        course_id=course.id
+    ).first()
+
+    if not enrollment:
+        flash("You are not enrolled in this class.", "danger")
+        return redirect(url_for("student.student_home"))
+
+    # FETCH ALL STUDENTS ENROLLED IN THIS CLASS
+    students = (
+        db.session.query(User)
+        .join(StudentClass, StudentClass.student_id == User.id)
+        .filter(StudentClass.course_id == course.id)
+        .all()
+    )
+
+    return render_template(
+        "student/student-class.html",
+        course=course,
+        instructor=course.instructor,
+        students=students
+    )
+
+
+
+@bp.route("/student/lessons")
+@login_required(role='student')
+def student_lessons():
+    enrolled_courses = (
+        db.session.query(Course)
+        .join(StudentClass)
+        .filter(StudentClass.student_id == session['user_id'])
+        .all()
+    )
+
+    active_courses = [c for c in enrolled_courses if not c.is_archived]
+    archived_courses = [c for c in enrolled_courses if c.is_archived]
+
+    courses = [
+        {
+            "title": course.name,
+            "lessons": [lesson.title for lesson in course.lessons]
+        }
+        for course in active_courses
+    ]
+
+    classes = [
+        {
+            "code": course.code,
+            "name": course.name,
+            "subject": course.subject,
+            "instructor": course.instructor.name
+        }
+        for course in active_courses
+    ]
+
+    archived_classes = [
+        {
+            "code": course.code,
+            "name": course.name,
+            "subject": course.subject,
+            "instructor": course.instructor.name
+        }
+        for course in archived_courses
+    ]
+
+    return render_template(
+        "student/student-lessons.html",
+        courses=courses,
+        classes=classes,
+        archived_classes=archived_classes
+    )
+
+
+@bp.route("/student/class/<class_code>/unenroll", methods=["POST"])
+@login_required(role="student")
+def unenroll_class(class_code):
+    course = Course.query.filter_by(code=class_code).first_or_404()
+
+    enrollment = StudentClass.query.filter_by(
+        student_id=session["user_id"],
+        course_id=course.id
+    ).first()
+
+    if enrollment:
+        db.session.delete(enrollment)
+        db.session.commit()
+
+    flash("You have been unenrolled from the class.", "success")
+    return redirect(url_for("student.student_home"))
+
+
+
+def enrolled_lesson_ids():
+    # Lessons of the active classes the student is enrolled in
+    return (
+        db.select(Lesson.id)
+        .join(Course, Course.id == Lesson.course_id)
+        .join(StudentClass, StudentClass.course_id == Course.id)
+        .where(StudentClass.student_id == session['user_id'])
+        .where(Course.is_archived == False)
+    )
+
+@bp.route('/student/exercises')
+@login_required(role='student')
+def student_exercises():
+    item_counts = (
+        db.session.query(Lesson, Course, db.func.count(ExerciseItem.id))
+        .join(Course, Course.id == Lesson.course_id)
+        .join(ExerciseItem, ExerciseItem.lesson_id == Lesson.id)
+        .filter(Lesson.id.in_(enrolled_lesson_ids()))
+        .group_by(Lesson.id)
+        .order_by(Course.name, Lesson.posted_on)
+        .all()
+    )
+    due_counts = dict(
+        db.session.query(ExerciseItem.lesson_id, db.func.count(ExerciseReview.id))
+        .join(ExerciseReview, ExerciseReview.item_id == ExerciseItem.id)
+        .filter(ExerciseReview.student_id == session['user_id'], ExerciseReview.due_on <= utcnow())
+        .group_by(ExerciseItem.lesson_id)
+        .all()
+    )
+
+    lessons = [
+        {
+            "id": lesson.id,
+            "title": lesson.title,
+            "course": course.name,
+            "items": count,
+            "due": due_counts.get(lesson.id, 0)
+        }
+        for lesson, course, count in item_counts
+    ]
+
+    return render_template('student/student-exercises.html', lessons=lessons)
+
+@bp.route('/student/exercises/next')
+@login_required(role='student')
+def next_exercises():
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    lesson_ids = enrolled_lesson_ids()
+    lesson_id = request.args.get('lesson', type=int)
+    if lesson_id:
+        lesson_ids = lesson_ids.where(Lesson.id == lesson_id)
+
+    # Reviews that are due come first, straight off the (student_id, due_on) index
+    items = (
+        ExerciseItem.query
+        .join(ExerciseReview, ExerciseReview.item_id == ExerciseItem.id)
+        .filter(ExerciseReview.student_id == session['user_id'], ExerciseReview.due_on <= utcnow())
+        .filter(ExerciseItem.lesson_id.in_(lesson_ids))
+        .order_by(ExerciseReview.due_on)
+        .limit(limit)
+        .all()
+    )
+
+    # Then items the student has not seen yet
+    if len(items) < limit:
+        seen = (
+            db.session.query(ExerciseReview.id)
+            .filter(ExerciseReview.student_id == session['user_id'], ExerciseReview.item_id == ExerciseItem.id)
+            .exists()
+        )
+        items += (
+            ExerciseItem.query
+            .filter(ExerciseItem.lesson_id.in_(lesson_ids))
+            .filter(~seen)
+            .order_by(ExerciseItem.lesson_id, ExerciseItem.position)
+            .limit(limit - len(items))
+            .all()
+        )
+
+    return jsonify({
+        "items": [
+            {"id": i.id, "lesson_id": i.lesson_id, "kind": i.kind, "prompt": i.prompt, "choices": i.choices}
+            for i in items
+        ]
+    })
+
+@bp.route('/student/exercises/<int:item_id>/answer', methods=['POST'])
+@login_required(role='student')
+def answer_exercise(item_id):
+    item = ExerciseItem.query.filter(
+        ExerciseItem.id == item_id,
+        ExerciseItem.lesson_id.in_(enrolled_lesson_ids())
+    ).first_or_404()
+
+    answer = request.get_json().get('answer')
+    if answer is None:
+        return jsonify({"error": "Missing answer"}), 400
+
+    correct = normalize_answer(answer) == normalize_answer(item.answer)
+
+    review = ExerciseReview.query.filter_by(student_id=session['user_id'], item_id=item.id).first()
+    if not review:
+        review = ExerciseReview(student_id=session['user_id'], item_id=item.id, interval_days=0, ease=2.5, repetitions=0, lapses=0)
+        db.session.add(review)
+
+    schedule_review(review, correct)
+    db.session.commit()
+
+    return jsonify({
+        "correct": correct,
+        "answer": item.answer,
+        "due_on": review.due_on.isoformat()
+    })
+
+@bp.route('/student/practice')
+@login_required(role='student')
+def student_practice():
+    # Fetch all chats for the logged-in student
+    chats = Chat.query.filter_by(student_id=session['user_id']).order_by(Chat.created_on.desc()).all()
+
+    scenarios = published_scenarios_query().order_by(Course.name, Scenario.title).all()
+
+    return render_template(
+        'student/student-practice.html',
+        chats=chats,
+        scenarios=scenarios
+    )
+
+@bp.route("/student/chat/<chat_type>/<int:chat_id>")
+@login_required(role='student')
+def student_chat(chat_type, chat_id):
+    chat = Chat.query.filter_by(
+        id=chat_id,
+        student_id=session['user_id']
+    ).first_or_404()
+
+    return render_template(
+        "student/student-chat.html",
+        chat=chat,
+        chat_type=chat_type,
+        chat_id=chat.id
+    )
+
+def published_scenarios_query():
+    # Published scenarios of the active classes the student is enrolled in
+    return (
+        Scenario.query
+        .join(Course)
+        .join(StudentClass, StudentClass.course_id == Course.id)
+        .filter(StudentClass.student_id == session['user_id'])
+        .filter(Course.is_archived == False)
+        .filter(Scenario.status == 'Published')
+    )
+
+@bp.route('/student/chat/new', methods=['POST'])
+@login_required(role='student')
+def create_new_chat():
+    data = request.get_json()
+    title = data.get('title')
+    description = data.get('prompt')  # match your modal's prompt field
+    difficulty = data.get('difficulty')
+    character = data.get('character')
+    scenario_id = data.get('scenario_id')
+
+    scenario = None
+    if scenario_id:
+        scenario = published_scenarios_query().filter(Scenario.id == scenario_id).first()
+        if not scenario:
+            return {"error": "Scenario not available"}, 404
+
+        # The scenario supplies the topic, the student only picks difficulty and character
+        title = title or scenario.title
+        description = description or scenario.description or scenario.title
+
+    if not title or not description or not difficulty or not character:
+        return {"error": "All fields are required"}, 400
+
+    # Make sure you have a Chat model
+    new_chat = Chat(
+        title=title,
+        description=description,
+        difficulty=difficulty,
+        character=character,
+        scenario_id=scenario.id if scenario else None,
+        student_id=session['user_id']
+    )
+
+    db.session.add(new_chat)
+    db.session.commit()
+
+    return {'chat_id': new_chat.id}, 200
+
+@bp.route("/student/chat/new/<int:chat_id>")
+@login_required(role='student')
+def student_chat_new(chat_id):
+    chat = Chat.query.filter_by(
+        id=chat_id,
+        student_id=session['user_id']
+    ).first_or_404()
+
+    return render_template(
+        "student/student-chat.html",
+        chat=chat,
+        chat_id=chat.id,
+        chat_type="new"
+    )
+
+@bp.route("/student/chat/<int:chat_id>/set-background", methods=['POST'])
+@login_required(role='student')
+def set_chat_background(chat_id):
+    chat = Chat.query.filter_by(id=chat_id, student_id=session['user_id']).first_or_404()
+    data = request.get_json()
+    chat.background = data.get('background', 'chat-bg1.png')
+    db.session.commit()
+    return jsonify({"success": True})
+
+@bp.route("/student/chat/<int:chat_id>/send", methods=["POST"])
+@login_required(role="student")
+def send_message(chat_id):
+    chat = Chat.query.filter_by(
+        id=chat_id,
+        student_id=session["user_id"]
+    ).first_or_404()
+
+    data = request.get_json()
+    content = data.get("message")
+
+    if not content:
+        return jsonify({"success": False}), 400
+
+    msg = Message(
+        chat_id=chat.id,
+        sender="user",
+        content=content
+    )
+
+    db.session.add(msg)
+    db.session.commit()
+
+    return jsonify({
+        "success": True,
+        "message": {
+            "sender": "user",
+            "content": msg.content
+        }
+    })
+
+
+@bp.route("/student/chat/<int:chat_id>/delete", methods=["POST"])
+@login_required(role="student")
+def delete_chat(chat_id):
+    chat = Chat.query.filter_by(
+        id=chat_id,
+        student_id=session['user_id']
+    ).first_or_404()
+
+    # messages are removed by ON DELETE CASCADE
+    db.session.delete(chat)
+    db.session.commit()
+
+    return jsonify({"success": True})
+
+
+@bp.route("/student/profile")
+@login_required(role='student')
+def student_profile():
+    student = {
+        "name": "Student Name",
+        "email": "student@email.com",
+        "student_id": "2024-00123",
+        "role": "Student",
+        "enrolled_since": "2024",
+        "courses": 4,
+        "completed": 23,
+        "progress": 68,
+        "last_active": "2 hrs ago"
+    }
+    return render_template("student/student-profile.html", student=student)
+
+@bp.route("/student/settings")
+@login_required(role='student')
+def student_settings():
+    return render_template("student/student-settings.html")
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import unittest
+
+# Startup budget for `import app; app.create_app()`: heavy optional dependencies must
+# stay lazy (loaded on first use), and total import time must stay under the budget.
+# Run with: python -m unittest test_startup
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+LAZY_MODULES = ('openai', 'numpy', 'redis')
+IMPORT_BUDGET_US = 2_000_000
+
+
+def import_times():
+    # Default configuration: every blueprint, no Redis broker
+    env = {k: v for k, v in os.environ.items() if k not in ('FLUENTKO_BLUEPRINTS', 'LIVE_BROKER_URL')}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app; app.create_app()'],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    # "import time: <self us> | <cumulative us> | <indent><module>", two spaces of indent per level
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name[1:]
+        rows.append((name.strip(), int(cumulative), not name.startswith(' ')))
+    return rows
+
+
+class StartupTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.rows = import_times()
+
+    def test_optional_dependencies_stay_lazy(self):
+        loaded = {name.split('.')[0] for name, _, _ in self.rows}
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, loaded, f"{module} is imported at startup")
+
+    def test_import_time_budget(self):
+        total = sum(cumulative for _, cumulative, top_level in self.rows if top_level)
+        self.assertLess(total, IMPORT_BUDGET_US, f"startup imports took {total / 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    unittest.main()